@@ -0,0 +1,216 @@
+"""
+Admission Control - keeps the AI service responsive under load.
+Per-user token buckets throttle chatty clients, and a global in-flight cap with
+a bounded wait queue sheds excess work with 429/503 instead of queueing forever.
+
+State is per process: with N workers the effective per-user limit and in-flight
+cap are N times the configured values, so size them per worker.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import request, jsonify
+
+
+# Token bucket limits as (burst capacity, refill tokens per second).
+# "*" applies to any route/role without a more specific entry.
+DEFAULT_RATE_LIMITS = {
+    "*": {"*": [20, 1.0]},
+    "chat": {"*": [10, 0.5], "faculty": [15, 0.75], "admin": [30, 1.5]},
+    "analyze": {"*": [5, 0.1], "admin": [10, 0.25]},
+    "suggestions": {"*": [30, 2.0]},
+    "leave-advice": {"*": [5, 0.1]},
+    "library-renewal": {"*": [5, 0.1]},
+}
+
+# Roles that may select role-specific limits; anything else uses the "*" entry.
+KNOWN_ROLES = ("student", "faculty", "admin")
+
+# Request body fields that identify the caller, checked in order. The Node server
+# sends userId for chat and studentId for the leave/library advisors.
+IDENTITY_FIELDS = ("userId", "studentId")
+
+
+def _parse_limit(value):
+    """Validate a [capacity, rate] pair, returning it as a tuple or None if malformed."""
+    if not isinstance(value, (list, tuple)) or len(value) != 2:
+        return None
+    capacity, rate = value
+    for n in (capacity, rate):
+        if isinstance(n, bool) or not isinstance(n, (int, float)) or n < 0:
+            return None
+    if capacity < 1:
+        return None
+    return capacity, rate
+
+
+def _parse_limits(raw):
+    """Validate a {route: {role: [capacity, rate]}} mapping, dropping bad entries."""
+    limits = {}
+    if not isinstance(raw, dict):
+        return limits, False
+    ok = True
+    for route, roles in raw.items():
+        if not isinstance(roles, dict):
+            ok = False
+            continue
+        for role, value in roles.items():
+            parsed = _parse_limit(value)
+            if parsed is None:
+                ok = False
+                continue
+            limits.setdefault(route, {})[role] = parsed
+    return limits, ok
+
+
+class TokenBucket:
+    """A refilling token bucket. Each bucket has its own lock so users never contend with each other."""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated", "lock")
+
+    def __init__(self, capacity, rate):
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        """Consume one token. Returns 0 on success, else seconds until a token is available."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            if self.rate <= 0:
+                return 60
+            return (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    def __init__(self, limits=None, max_inflight=16, max_queue=32, queue_timeout=2.0,
+                 max_buckets=10000):
+        self.limits = _parse_limits(limits or DEFAULT_RATE_LIMITS)[0]
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_buckets = max_buckets
+
+        # LRU of buckets: the dict lock is only held for O(1) lookups and evictions.
+        self._buckets = OrderedDict()
+        self._buckets_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_inflight)
+        self._waiting = 0
+        self._waiting_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Build a controller from environment variables (RATE_LIMITS is a JSON object)."""
+        limits = {route: dict(roles) for route, roles in DEFAULT_RATE_LIMITS.items()}
+        raw = os.getenv("RATE_LIMITS")
+        if raw:
+            try:
+                overrides, ok = _parse_limits(json.loads(raw))
+            except ValueError:
+                overrides, ok = {}, False
+            if not ok:
+                print("⚠️ Ignoring invalid RATE_LIMITS entries, using defaults for them")
+            for route, roles in overrides.items():
+                limits[route] = {**limits.get(route, {}), **roles}
+        return cls(
+            limits=limits,
+            max_inflight=int(os.getenv("MAX_INFLIGHT_REQUESTS", 16)),
+            max_queue=int(os.getenv("MAX_QUEUED_REQUESTS", 32)),
+            queue_timeout=float(os.getenv("QUEUE_TIMEOUT_SECONDS", 2.0)),
+        )
+
+    def limit(self, route):
+        """Decorator applying per-user rate limiting and global admission to a Flask view."""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                data = request.get_json(silent=True)
+                if not isinstance(data, dict):
+                    data = {}
+                user_id = next((data[f] for f in IDENTITY_FIELDS if data.get(f)), "anonymous")
+                role = data.get("role", "student")
+
+                wait = self.check_rate(route, str(user_id), role)
+                if wait:
+                    return self._reject(429, "Too many requests, please slow down.", wait)
+
+                if not self.acquire():
+                    return self._reject(503, "Service is busy, please try again shortly.", 1)
+                try:
+                    return view(*args, **kwargs)
+                finally:
+                    self.release()
+            return wrapper
+        return decorator
+
+    def check_rate(self, route, user_id, role):
+        """Returns 0 if the request is allowed, else seconds the caller should wait."""
+        key = (route, user_id)
+        with self._buckets_lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(*self._limit_for(route, role))
+                # Evicting the least recently seen user can only ever be generous to them.
+                while len(self._buckets) > self.max_buckets:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+        return bucket.take()
+
+    def acquire(self):
+        """Take an in-flight slot, waiting in the bounded queue if needed. False means shed."""
+        with self._waiting_lock:
+            # Only skip the queue when nobody is in it, so a freed slot goes to the
+            # oldest waiter rather than to whoever happens to arrive next.
+            if self._waiting == 0 and self._slots.acquire(blocking=False):
+                return True
+            if self._waiting >= self.max_queue:
+                return False
+            self._waiting += 1
+        try:
+            return self._slots.acquire(timeout=self.queue_timeout)
+        finally:
+            with self._waiting_lock:
+                self._waiting -= 1
+
+    def release(self):
+        self._slots.release()
+
+    def stats(self):
+        return {
+            "maxInflight": self.max_inflight,
+            "maxQueue": self.max_queue,
+            "queued": self._waiting,
+            "trackedUsers": len(self._buckets),
+        }
+
+    def _limit_for(self, route, role):
+        if not isinstance(role, str) or role not in KNOWN_ROLES:
+            role = "*"
+        route_limits = self.limits.get(route) or self.limits.get("*", {})
+        capacity, rate = (
+            route_limits.get(role)
+            or route_limits.get("*")
+            or self.limits.get("*", {}).get("*", [20, 1.0])
+        )
+        return capacity, rate
+
+    @staticmethod
+    def _reject(status, message, retry_after):
+        resp = jsonify({"error": message})
+        resp.status_code = status
+        resp.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+        return resp
@@ -3,23 +3,96 @@ Smart Campus AI Chatbot Service
 Flask-based Python service that handles AI chat, campus queries, and smart responses.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS
 from dotenv import load_dotenv
 import os
-import requests
 import json
+import threading
+import time
 from datetime import datetime
 
 from chat_engine import ChatEngine
+from admission import AdmissionController
+from cache import cache_from_env
 
 load_dotenv()
 
+BOOT_STARTED = time.monotonic()
+
 app = Flask(__name__)
 CORS(app)
 
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:5000")
-chat_engine = ChatEngine(backend_url=BACKEND_URL)
+chat_engine = ChatEngine(
+    backend_url=BACKEND_URL,
+    pool_size=int(os.getenv("BACKEND_POOL_SIZE", 10)),
+    shared_ttl=int(os.getenv("SHARED_CACHE_TTL", 60)),
+    cache=cache_from_env(),
+)
+admission = AdmissionController.from_env()
+
+startup = {
+    "pid": None,
+    "ready": False,
+    "startupMs": None,
+    "firstRequestMs": None,
+    "warmup": None,
+}
+_warm_up_lock = threading.Lock()
+
+
+def warm_up(started):
+    """Prime the KB index, backend connection pool and shared caches before reporting ready."""
+    try:
+        startup["warmup"] = chat_engine.warm_up()
+    except Exception as e:
+        startup["warmup"] = {"error": str(e)}
+    startup["startupMs"] = round((time.monotonic() - started) * 1000, 1)
+    startup["ready"] = True
+    print(f"🔥 Warm-up finished in {startup['startupMs']} ms: {startup['warmup']}")
+
+
+def start_warm_up(started):
+    """Reset the readiness state for this process and warm up in the background."""
+    startup.update(pid=os.getpid(), ready=False, startupMs=None, firstRequestMs=None, warmup=None)
+    threading.Thread(target=warm_up, args=(started,), name="warm-up", daemon=True).start()
+
+
+def ensure_warm_up():
+    """Re-run warm-up if this process hasn't done its own, e.g. a worker forked without the hook."""
+    if startup["pid"] == os.getpid():
+        return
+    with _warm_up_lock:
+        if startup["pid"] != os.getpid():
+            start_warm_up(time.monotonic())
+
+
+def _after_fork_in_child():
+    # The parent's lock may have been held mid-fork, and its warm-up thread didn't survive.
+    global _warm_up_lock
+    _warm_up_lock = threading.Lock()
+    start_warm_up(time.monotonic())
+
+
+@app.before_request
+def start_timer():
+    ensure_warm_up()
+    g.request_started = time.monotonic()
+
+
+@app.after_request
+def record_first_request(response):
+    if (
+        startup["firstRequestMs"] is None
+        and request.path not in ("/health", "/ready")
+        and 200 <= response.status_code < 300
+    ):
+        started = getattr(g, "request_started", None)
+        if started is not None:
+            startup["firstRequestMs"] = round((time.monotonic() - started) * 1000, 1)
+            print(f"⏱️ First request {request.path} took {startup['firstRequestMs']} ms")
+    return response
 
 
 @app.route("/health", methods=["GET"])
@@ -28,10 +101,30 @@ def health():
         "status": "ok",
         "service": "Smart Campus AI Chatbot",
         "timestamp": datetime.now().isoformat(),
+        "admission": admission.stats(),
+        "cache": chat_engine.cache.stats(),
     })
 
 
+@app.route("/ready", methods=["GET"])
+def ready():
+    """Readiness probe - only reports ready once the warm-up stage has completed.
+
+    Warm-up finishing is what counts, not the backend being reachable: if the
+    pre-fetch fails (sharedEndpoints is 0) we still report ready, since chat
+    falls back to static answers and the cache fills on first use.
+    """
+    body = {
+        "status": "ready" if startup["ready"] else "warming_up",
+        "startupMs": startup["startupMs"],
+        "firstRequestMs": startup["firstRequestMs"],
+        "warmup": startup["warmup"],
+    }
+    return jsonify(body), 200 if startup["ready"] else 503
+
+
 @app.route("/chat", methods=["POST"])
+@admission.limit("chat")
 def chat():
     """Main chat endpoint - receives user messages and returns AI responses."""
     data = request.json
@@ -54,6 +147,7 @@ def chat():
 
 
 @app.route("/chat/analyze", methods=["POST"])
+@admission.limit("analyze")
 def analyze():
     """Analyze campus data and provide insights."""
     data = request.json
@@ -71,6 +165,7 @@ def analyze():
 
 
 @app.route("/chat/suggestions", methods=["POST"])
+@admission.limit("suggestions")
 def suggestions():
     """Get contextual suggestions based on the current page/section."""
     data = request.json
@@ -82,6 +177,7 @@ def suggestions():
 
 
 @app.route("/chat/leave-advice", methods=["POST"])
+@admission.limit("leave-advice")
 def leave_advice():
     """Analyze attendance data and advise how many leaves the student can take."""
     data = request.json
@@ -92,7 +188,7 @@ def leave_advice():
 
     try:
         # Fetch attendance summary from Node backend
-        resp = requests.get(
+        resp = chat_engine.session.get(
             f"{BACKEND_URL}/api/attendance/summary",
             params={"studentId": user_id, "branch": branch, "semester": semester},
             timeout=5,
@@ -163,13 +259,14 @@ def leave_advice():
 
 
 @app.route("/chat/library-renewal", methods=["POST"])
+@admission.limit("library-renewal")
 def library_renewal():
     """Advise on book renewals based on due dates."""
     data = request.json
     user_id = data.get("userId", "")
 
     try:
-        resp = requests.get(
+        resp = chat_engine.session.get(
             f"{BACKEND_URL}/api/library/my-books",
             params={"studentId": user_id},
             timeout=5,
@@ -213,8 +310,17 @@ def library_renewal():
     })
 
 
+DEBUG = os.getenv("FLASK_DEBUG", "true").lower() == "true"
+
+# Warm up at import so every worker is primed before traffic arrives. When run
+# directly with the reloader on, only the child that serves requests warms up.
+if __name__ != "__main__" or not DEBUG or os.getenv("WERKZEUG_RUN_MAIN") == "true":
+    start_warm_up(BOOT_STARTED)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
 if __name__ == "__main__":
     port = int(os.getenv("FLASK_PORT", 8000))
-    debug = os.getenv("FLASK_DEBUG", "true").lower() == "true"
     print(f"🤖 Smart Campus AI Service running on http://localhost:{port}")
-    app.run(host="0.0.0.0", port=port, debug=debug)
+    app.run(host="0.0.0.0", port=port, debug=DEBUG)
@@ -0,0 +1,245 @@
+"""
+Cache Backends - response caching shared between AI service workers.
+An in-process tier answers hot keys without I/O, and a WAL-mode SQLite file on
+the local host lets every worker reuse what any other worker already fetched.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class CacheBackend(ABC):
+    """Interface every cache tier implements. Values must be JSON-serialisable."""
+
+    @abstractmethod
+    def get(self, key):
+        pass
+
+    @abstractmethod
+    def set(self, key, value, ttl):
+        pass
+
+    @abstractmethod
+    def ttl(self, key):
+        """Seconds until key expires, or 0 if it is missing/expired."""
+
+    @abstractmethod
+    def delete(self, key):
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+    def stats(self):
+        return {}
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU cache with per-entry TTL."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def ttl(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return max(0, entry[0] - time.time()) if entry else 0
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {"type": "memory", "entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class SQLiteCache(CacheBackend):
+    """Host-wide cache in a WAL-mode SQLite file, safe to share between worker processes."""
+
+    PRUNE_EVERY = 50
+
+    def __init__(self, path, max_entries=1000):
+        self.path = path
+        self.max_entries = max_entries
+        self._db = None
+        self._pid = None
+        self._stale = []
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+
+        # WAL mode is persistent in the file, so it is set once here, on a connection
+        # that is closed again so nothing is opened before a worker fork.
+        setup = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        try:
+            setup.execute("PRAGMA journal_mode=WAL")
+            setup.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            setup.execute("CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires_at)")
+        finally:
+            setup.close()
+
+    @contextmanager
+    def _conn(self):
+        """One connection per process, shared by its threads under a lock."""
+        if self._pid != os.getpid():
+            self._connect()
+        with self._lock:
+            yield self._db
+
+    def _connect(self):
+        if self._db is not None:
+            # Inherited across fork: SQLite says not to use or close it in the child,
+            # so just keep it referenced and open our own.
+            self._stale.append(self._db)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            self.path, timeout=5, isolation_level=None, check_same_thread=False
+        )
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._pid = os.getpid()
+
+    def get(self, key):
+        with self._conn() as conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def ttl(self, key):
+        with self._conn() as conn:
+            row = conn.execute("SELECT expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        return max(0, row[0] - time.time()) if row else 0
+
+    def set(self, key, value, ttl):
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + ttl),
+            )
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self._prune()
+
+    def delete(self, key):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM cache")
+
+    def _prune(self):
+        """Drop expired rows, then the soonest-to-expire ones beyond max_entries."""
+        with self._conn() as conn:
+            conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+            conn.execute(
+                "DELETE FROM cache WHERE key IN ("
+                "SELECT key FROM cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def stats(self):
+        try:
+            with self._conn() as conn:
+                count = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        except sqlite3.Error:
+            count = None
+        return {"type": "sqlite", "entries": count, "hits": self.hits, "misses": self.misses}
+
+
+class TieredCache(CacheBackend):
+    """Checks the in-process tier first, then the shared tier, back-filling on a shared hit."""
+
+    def __init__(self, local, shared):
+        self.local = local
+        self.shared = shared
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        value = self.shared.get(key)
+        if value is not None:
+            # Don't let the local copy outlive the shared entry.
+            ttl = self.shared.ttl(key)
+            if ttl > 0:
+                self.local.set(key, value, ttl)
+        return value
+
+    def set(self, key, value, ttl):
+        self.local.set(key, value, ttl)
+        self.shared.set(key, value, ttl)
+
+    def delete(self, key):
+        self.local.delete(key)
+        self.shared.delete(key)
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
+
+    def stats(self):
+        return {"local": self.local.stats(), "shared": self.shared.stats()}
+
+    def ttl(self, key):
+        return self.local.ttl(key) or self.shared.ttl(key)
+
+
+def cache_from_env():
+    """Build the cache from CACHE_BACKEND ("memory" or "sqlite") and related settings."""
+    local = MemoryCache(max_entries=int(os.getenv("CACHE_MAX_ENTRIES", 256)))
+    if os.getenv("CACHE_BACKEND", "sqlite").lower() != "sqlite":
+        return local
+
+    # Default next to the app rather than in shared /tmp, so separate deployments on
+    # one host never read each other's file and other local users can't seed it.
+    path = os.getenv("CACHE_PATH") or os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "ai-cache.sqlite")
+    try:
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        shared = SQLiteCache(path, max_entries=int(os.getenv("SHARED_CACHE_MAX_ENTRIES", 1000)))
+    except (OSError, sqlite3.Error) as e:
+        print(f"⚠️ Shared cache unavailable ({e}), using in-process cache only")
+        return local
+    return TieredCache(local, shared)
@@ -6,16 +6,63 @@ Trained on Smart Campus Knowledge Base with complete feature documentation.
 
 import re
 import requests
+from requests.adapters import HTTPAdapter
 import json
 from datetime import datetime
 import os
 
+from cache import MemoryCache
+
+
+# Backend endpoints whose responses are identical for every user, so they can be
+# pre-fetched at startup and served from cache for a short while. Only public
+# endpoints belong here: the service sends no auth token, so protected ones such
+# as /api/library/books would just 401 on every warm-up.
+SHARED_ENDPOINTS = (
+    "/api/placements?status=open",
+    "/api/hostel",
+)
+
+KB_SECTIONS = {
+    "attendance": "1.4 Attendance Module",
+    "assignment": "1.5 Assignments Module",
+    "library": "1.6 Library Module",
+    "hostel": "1.7 Hostel Module",
+    "placement": "1.8 Placements Module",
+    "feedback": "1.10 Feedback Module",
+    "help": "1. STUDENT PORTAL FEATURES",
+}
+
 
 class ChatEngine:
-    def __init__(self, backend_url="http://localhost:5000"):
+    def __init__(self, backend_url="http://localhost:5000", pool_size=10, shared_ttl=60, cache=None):
         self.backend_url = backend_url
+        self.shared_ttl = shared_ttl
+        self.cache = cache or MemoryCache()
+        self.session = self._build_session(pool_size)
         self.intents = self._build_intents()
         self.knowledge_base = self._load_knowledge_base()
+        self._kb_snippets = {}
+
+    def _build_session(self, pool_size):
+        """Create a pooled HTTP session so backend connections are reused across requests."""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def warm_up(self):
+        """Build the KB index, open backend connections and pre-fetch shared endpoints."""
+        for intent in KB_SECTIONS:
+            self._get_kb_snippet(intent)
+        self._detect_intent("hello")
+
+        fetched = 0
+        for path in SHARED_ENDPOINTS:
+            if self._api_get(path) is not None:
+                fetched += 1
+        return {"kbSections": len(self._kb_snippets), "sharedEndpoints": fetched}
 
     def _load_knowledge_base(self):
         """Load Smart Campus knowledge base from file."""
@@ -229,8 +276,8 @@ class ChatEngine:
     # ─── Private Methods ───
 
     def _build_intents(self):
-        """Build intent patterns for classification."""
-        return {
+        """Build compiled intent patterns for classification."""
+        patterns = {
             "greeting": r"\b(hi|hello|hey|good\s*(morning|afternoon|evening)|namaste)\b",
             "attendance": r"\b(attendance|absent|present|classes|bunk|detention)\b",
             "assignment": r"\b(assignment|homework|submission|submit|deadline|due)\b",
@@ -245,12 +292,13 @@ class ChatEngine:
             "feedback": r"\b(feedback|complaint|suggestion|review|rate|rating)\b",
             "faculty": r"\b(faculty|professor|teacher|sir|ma'am|dr\.)\b",
         }
+        return {intent: re.compile(pattern) for intent, pattern in patterns.items()}
 
     def _detect_intent(self, message):
         """Detect the primary intent from a user message."""
         msg = message.lower().strip()
         for intent, pattern in self.intents.items():
-            if re.search(pattern, msg):
+            if pattern.search(msg):
                 return intent
         return "general"
 
@@ -289,15 +337,37 @@ class ChatEngine:
         return None
 
     def _api_get(self, path):
-        """Make a GET request to the Node.js backend."""
+        """Make a GET request to the Node.js backend, serving shared endpoints from cache."""
+        shared = path in SHARED_ENDPOINTS
+        key = f"backend:{self.backend_url}{path}"
+        if shared:
+            cached = self._cache_get(key)
+            if cached is not None:
+                return cached
         try:
-            resp = requests.get(f"{self.backend_url}{path}", timeout=5)
+            resp = self.session.get(f"{self.backend_url}{path}", timeout=5)
             if resp.status_code == 200:
-                return resp.json()
+                data = resp.json()
+                if shared:
+                    self._cache_set(key, data, self.shared_ttl)
+                return data
         except Exception:
             pass
         return None
 
+    def _cache_get(self, key):
+        # A cache failure must never fail the request; fall through to the backend.
+        try:
+            return self.cache.get(key)
+        except Exception:
+            return None
+
+    def _cache_set(self, key, value, ttl):
+        try:
+            self.cache.set(key, value, ttl)
+        except Exception:
+            pass
+
     def _generate_response(self, message, intent, role, data):
         """Generate a contextual response based on intent and data."""
         msg = message.lower()
@@ -463,19 +533,11 @@ Ask me: "Pending student signups?" or "Create placement drive?"
         if not self.knowledge_base:
             return ""
 
-        section_map = {
-            "attendance": "1.4 Attendance Module",
-            "assignment": "1.5 Assignments Module",
-            "library": "1.6 Library Module",
-            "hostel": "1.7 Hostel Module",
-            "placement": "1.8 Placements Module",
-            "feedback": "1.10 Feedback Module",
-            "help": "1. STUDENT PORTAL FEATURES",
-        }
-
-        key = section_map.get(intent)
+        key = KB_SECTIONS.get(intent)
         if not key:
             return ""
+        if intent in self._kb_snippets:
+            return self._kb_snippets[intent]
 
         lines = self.knowledge_base.splitlines()
         snippet_lines = []
@@ -492,4 +554,6 @@ Ask me: "Pending student signups?" or "Create placement drive?"
                 if len(snippet_lines) >= 5:
                     break
 
-        return "\n".join(snippet_lines).strip()
+        snippet = "\n".join(snippet_lines).strip()
+        self._kb_snippets[intent] = snippet
+        return snippet
@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Importing app warms up at once; keep that off the shared cache file and pointed
+# at a closed port so the backend pre-fetch fails fast.
+os.environ.setdefault("CACHE_BACKEND", "memory")
+os.environ.setdefault("BACKEND_URL", "http://127.0.0.1:9")
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(request, monkeypatch):
+    """Freeze the clock named by the test module's CLOCK_TARGET, e.g. "cache.time.time"."""
+    fake = FakeClock()
+    monkeypatch.setattr(request.module.CLOCK_TARGET, fake)
+    return fake
@@ -0,0 +1,121 @@
+import threading
+
+import pytest
+from flask import Flask, jsonify
+
+from admission import AdmissionController, TokenBucket
+
+CLOCK_TARGET = "admission.time.monotonic"
+
+
+def make_app(controller, route="chat", gate=None):
+    app = Flask(__name__)
+
+    @app.route("/", methods=["POST"])
+    @controller.limit(route)
+    def view():
+        if gate:
+            gate.wait(2)
+        return jsonify({"ok": True})
+
+    return app
+
+
+def test_bucket_refills_over_time(clock):
+    bucket = TokenBucket(capacity=2, rate=0.5)
+    assert bucket.take() == 0
+    assert bucket.take() == 0
+    assert bucket.take() == pytest.approx(2.0)
+
+    clock.advance(2)
+    assert bucket.take() == 0
+    assert bucket.take() > 0
+
+
+def test_bucket_never_exceeds_capacity(clock):
+    bucket = TokenBucket(capacity=2, rate=1)
+    clock.advance(100)
+    assert [bucket.take() == 0 for _ in range(3)] == [True, True, False]
+
+
+def test_rate_limited_request_gets_429_with_retry_after(clock):
+    controller = AdmissionController(limits={"chat": {"*": [2, 0.1]}})
+    client = make_app(controller).test_client()
+
+    assert client.post("/", json={"userId": "u1"}).status_code == 200
+    assert client.post("/", json={"userId": "u1"}).status_code == 200
+    resp = client.post("/", json={"userId": "u1"})
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == "10"
+
+    assert client.post("/", json={"userId": "u2"}).status_code == 200
+
+
+def test_student_id_identifies_caller(clock):
+    controller = AdmissionController(limits={"chat": {"*": [1, 0.1]}})
+    client = make_app(controller).test_client()
+
+    statuses = [client.post("/", json={"studentId": f"s{i}"}).status_code for i in range(5)]
+    assert statuses == [200] * 5
+
+
+def test_role_does_not_create_new_buckets(clock):
+    controller = AdmissionController(limits={"chat": {"*": [2, 0.1], "admin": [50, 1]}})
+    for role in ("a", "b", ["x"], "admin"):
+        controller.check_rate("chat", "u1", role)
+    assert controller.check_rate("chat", "u1", "admin") > 0
+
+
+def test_unknown_role_uses_default_limits():
+    controller = AdmissionController(limits={"chat": {"*": [2, 0.1], "superuser": [50, 1]}})
+    assert controller._limit_for("chat", "superuser") == (2, 0.1)
+    assert controller._limit_for("chat", ["x"]) == (2, 0.1)
+
+
+def test_buckets_are_bounded():
+    controller = AdmissionController(max_buckets=10)
+    for i in range(100):
+        controller.check_rate("chat", str(i), "student")
+    assert len(controller._buckets) == 10
+    assert ("chat", "99") in controller._buckets
+
+
+def test_saturated_service_sheds_with_503():
+    controller = AdmissionController(max_inflight=1, max_queue=0)
+    gate = threading.Event()
+    app = make_app(controller, gate=gate)
+
+    busy = threading.Thread(target=lambda: app.test_client().post("/", json={"userId": "a"}))
+    busy.start()
+    try:
+        while controller.acquire():
+            controller.release()
+        resp = app.test_client().post("/", json={"userId": "b"})
+        assert resp.status_code == 503
+        assert resp.headers["Retry-After"] == "1"
+    finally:
+        gate.set()
+        busy.join()
+    assert app.test_client().post("/", json={"userId": "b"}).status_code == 200
+
+
+def test_invalid_rate_limits_are_ignored(monkeypatch):
+    monkeypatch.setenv("RATE_LIMITS", '{"chat": 5, "analyze": {"*": [10]}, "suggestions": {"admin": [3, 1]}}')
+    controller = AdmissionController.from_env()
+    assert controller.limits["chat"]["*"] == (10, 0.5)
+    assert controller.limits["analyze"]["*"] == (5, 0.1)
+    assert controller.limits["suggestions"]["admin"] == (3, 1)
+
+
+def test_malformed_rate_limits_json_is_ignored(monkeypatch):
+    monkeypatch.setenv("RATE_LIMITS", "not json")
+    assert AdmissionController.from_env().limits["chat"]["*"] == (10, 0.5)
+
+
+def test_new_arrivals_do_not_jump_the_queue():
+    controller = AdmissionController(max_inflight=1, max_queue=1, queue_timeout=0.1)
+    controller._waiting = 1
+    assert controller.acquire() is False
+
+    controller._waiting = 0
+    assert controller.acquire() is True
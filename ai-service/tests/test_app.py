@@ -0,0 +1,70 @@
+import os
+import time
+
+import pytest
+
+import app as service
+
+
+def wait_until_ready(timeout=2):
+    deadline = time.monotonic() + timeout
+    while not service.startup["ready"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return service.startup["ready"]
+
+
+@pytest.fixture
+def client():
+    assert wait_until_ready()
+    return service.app.test_client()
+
+
+def test_ready_reports_warming_up_until_warm_up_finishes(client, monkeypatch):
+    monkeypatch.setitem(service.startup, "ready", False)
+    resp = client.get("/ready")
+    assert resp.status_code == 503
+    assert resp.json["status"] == "warming_up"
+
+    service.warm_up(time.monotonic())
+    resp = client.get("/ready")
+    assert resp.status_code == 200
+    assert resp.json["status"] == "ready"
+
+
+def test_warm_up_with_unreachable_backend_still_reports_ready(client, monkeypatch):
+    def unreachable(*args, **kwargs):
+        raise ConnectionError("backend down")
+
+    monkeypatch.setattr(service.chat_engine.session, "get", unreachable)
+    monkeypatch.setitem(service.startup, "ready", False)
+    service.warm_up(time.monotonic())
+
+    assert service.startup["warmup"]["sharedEndpoints"] == 0
+    assert client.get("/ready").status_code == 200
+
+
+def test_first_request_ignores_probes_and_errors(client, monkeypatch):
+    monkeypatch.setitem(service.startup, "firstRequestMs", None)
+
+    client.get("/health")
+    client.get("/ready")
+    assert client.post("/chat", json={"userId": "first-request"}).status_code == 400
+    assert client.get("/missing").status_code == 404
+    assert service.startup["firstRequestMs"] is None
+
+    assert client.post("/chat/suggestions", json={"userId": "first-request"}).status_code == 200
+    assert service.startup["firstRequestMs"] is not None
+
+
+def test_changed_pid_triggers_fresh_warm_up(client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(service.chat_engine, "warm_up", lambda: calls.append(1) or {"kbSections": 0})
+    monkeypatch.setitem(service.startup, "pid", -1)
+
+    service.ensure_warm_up()
+    assert service.startup["pid"] == os.getpid()
+    assert wait_until_ready()
+    assert calls == [1]
+
+    service.ensure_warm_up()
+    assert calls == [1]
@@ -0,0 +1,150 @@
+import threading
+
+import pytest
+
+from cache import CacheBackend, MemoryCache, SQLiteCache, TieredCache
+from chat_engine import ChatEngine
+
+CLOCK_TARGET = "cache.time.time"
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    return str(tmp_path / "cache.sqlite")
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, sqlite_path):
+    if request.param == "memory":
+        return MemoryCache(max_entries=10)
+    return SQLiteCache(sqlite_path, max_entries=10)
+
+
+def test_get_returns_stored_value(backend):
+    backend.set("k", {"a": [1, 2]}, 60)
+    assert backend.get("k") == {"a": [1, 2]}
+    assert backend.get("missing") is None
+
+
+def test_entries_expire_after_ttl(backend, clock):
+    backend.set("k", "v", 10)
+    assert backend.ttl("k") == pytest.approx(10)
+    clock.advance(9)
+    assert backend.get("k") == "v"
+    clock.advance(2)
+    assert backend.get("k") is None
+    assert backend.ttl("k") == 0
+
+
+def test_memory_cache_evicts_least_recently_used():
+    c = MemoryCache(max_entries=3)
+    for key in "abc":
+        c.set(key, key, 60)
+    c.get("a")
+    c.set("d", "d", 60)
+    assert c.get("b") is None
+    assert [c.get(key) for key in "acd"] == ["a", "c", "d"]
+
+
+def test_sqlite_cache_prunes_past_max_entries(sqlite_path):
+    c = SQLiteCache(sqlite_path, max_entries=10)
+    for i in range(SQLiteCache.PRUNE_EVERY):
+        c.set(f"k{i}", i, 60 + i)
+    assert c.stats()["entries"] == 10
+    # The entries kept are the ones that expire last.
+    assert c.get(f"k{SQLiteCache.PRUNE_EVERY - 1}") == SQLiteCache.PRUNE_EVERY - 1
+    assert c.get("k0") is None
+
+
+def test_sqlite_cache_is_shared_between_instances(sqlite_path):
+    SQLiteCache(sqlite_path).set("k", "v", 60)
+    assert SQLiteCache(sqlite_path).get("k") == "v"
+
+
+def test_tiered_cache_backfills_local_tier(sqlite_path, clock):
+    shared = SQLiteCache(sqlite_path)
+    shared.set("k", "v", 30)
+    clock.advance(10)
+
+    tiered = TieredCache(MemoryCache(), shared)
+    assert tiered.local.get("k") is None
+    assert tiered.get("k") == "v"
+    # The local copy must not outlive the shared entry.
+    assert tiered.local.ttl("k") == pytest.approx(20)
+
+
+def test_tiered_cache_writes_both_tiers(sqlite_path):
+    tiered = TieredCache(MemoryCache(), SQLiteCache(sqlite_path))
+    tiered.set("k", "v", 60)
+    assert tiered.local.get("k") == "v"
+    assert tiered.shared.get("k") == "v"
+
+
+def test_cache_keys_are_scoped_to_backend(monkeypatch):
+    shared = MemoryCache()
+    prod = ChatEngine(backend_url="http://prod", cache=shared)
+    staging = ChatEngine(backend_url="http://staging", cache=shared)
+    calls = []
+
+    class Response:
+        status_code = 200
+
+        def __init__(self, url):
+            self.url = url
+
+        def json(self):
+            return [self.url]
+
+    for engine in (prod, staging):
+        monkeypatch.setattr(engine.session, "get", lambda url, timeout: calls.append(url) or Response(url))
+
+    assert staging._api_get("/api/hostel") == ["http://staging/api/hostel"]
+    assert prod._api_get("/api/hostel") == ["http://prod/api/hostel"]
+    assert prod._api_get("/api/hostel") == ["http://prod/api/hostel"]
+    assert len(calls) == 2
+
+
+def test_incomplete_backend_fails_at_instantiation():
+    class NoTTL(CacheBackend):
+        def get(self, key):
+            return None
+
+        def set(self, key, value, ttl):
+            pass
+
+        def delete(self, key):
+            pass
+
+        def clear(self):
+            pass
+
+    with pytest.raises(TypeError):
+        NoTTL()
+
+
+def test_sqlite_cache_shares_one_connection_between_threads(sqlite_path):
+    c = SQLiteCache(sqlite_path)
+    c.set("k", "v", 60)
+    conn = c._db
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(c.get("k"))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == ["v"] * 5
+    assert c._db is conn
+
+
+def test_sqlite_cache_reconnects_after_fork(sqlite_path, monkeypatch):
+    c = SQLiteCache(sqlite_path)
+    c.set("k", "v", 60)
+    parent_conn = c._db
+
+    monkeypatch.setattr("cache.os.getpid", lambda: -1)
+    assert c.get("k") == "v"
+    assert c._db is not parent_conn
+
+
+def test_sqlite_stats_do_not_expose_path(sqlite_path):
+    assert "path" not in SQLiteCache(sqlite_path).stats()